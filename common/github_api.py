@@ -0,0 +1,296 @@
+"""
+Shared GitHub API helpers
+=========================
+
+Rate limiting, ETag response caching, search fan-out, contributor
+dispatch and JSON output used by languages/scrape.py and repos/popular.py.
+"""
+
+import asyncio
+import hashlib
+import shelve
+import threading
+import time
+from typing import Callable, List, Dict, Optional
+from pathlib import Path
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import httpx
+import orjson
+
+SEARCH_URL = "https://api.github.com/search/repositories"
+GRAPHQL_URL = "https://api.github.com/graphql"
+
+# Shared by the pooled HTTP/2 clients for every GitHub call
+REQUEST_TIMEOUT = 30
+
+# Cap on in-flight search requests to stay clear of GitHub's secondary rate limits
+SEARCH_CONCURRENCY = 5
+
+# Worker threads used to overlap contributor pagination across repositories
+CONTRIBUTOR_WORKERS = 10
+
+# The search API returns at most 1000 results, i.e. 10 pages of 100
+SEARCH_MAX_PAGES = 10
+
+# Retries for throttled requests back off 1, 2, 4, 8, 16 and 32 seconds
+MAX_RETRIES = 6
+BACKOFF_BASE = 1
+
+# GitHub asks clients that trip a secondary limit to wait at least a minute
+SECONDARY_LIMIT_WAIT = 60
+
+# 1 MiB write buffer so large exports flush in few syscalls
+WRITE_BUFFER_SIZE = 1 << 20
+
+# On-disk response cache shared across runs and scrapers; entries are keyed
+# by URL and credentials, so sharing it is safe
+CACHE_PATH = str(Path(__file__).resolve().parent / ".gh_cache")
+
+class RateLimiter:
+    """Track GitHub's rate-limit headers and throttle only when the budget runs low."""
+
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        self.remaining = None
+        self.reset_at = None
+        self._lock = threading.Lock()
+
+    def update(self, headers) -> None:
+        """Record the budget advertised by a response's headers."""
+        with self._lock:
+            if "X-RateLimit-Remaining" in headers:
+                self.remaining = int(headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Reset" in headers:
+                self.reset_at = float(headers["X-RateLimit-Reset"])
+
+    def delay(self) -> float:
+        """Seconds to wait so the remaining budget lasts until the window resets."""
+        with self._lock:
+            if self.remaining is None or self.reset_at is None or self.remaining >= self.threshold:
+                return 0.0
+            seconds_to_reset = max(0.0, self.reset_at - time.time())
+            if self.remaining <= 0:
+                return seconds_to_reset
+            return seconds_to_reset / self.remaining
+
+# The search API has its own, much smaller budget (30/min) than the core API (5000/h);
+# GraphQL is metered in points against a third budget
+core_limiter = RateLimiter(threshold=100)
+search_limiter = RateLimiter(threshold=5)
+graphql_limiter = RateLimiter(threshold=100)
+
+def is_secondary_limited(response: httpx.Response) -> bool:
+    """Whether a 403 was caused by a secondary rate limit, which may carry no headers."""
+    return response.status_code == 403 and "secondary rate limit" in response.text.lower()
+
+def is_rate_limited(response: httpx.Response) -> bool:
+    """Whether a response was rejected by primary or secondary rate limiting."""
+    if response.status_code == 429:
+        return True
+    headers = response.headers
+    return response.status_code == 403 and (
+        "Retry-After" in headers
+        or headers.get("X-RateLimit-Remaining") == "0"
+        or is_secondary_limited(response)
+    )
+
+def backoff_delay(response: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before retrying the throttled response."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        return float(retry_after)
+    if is_secondary_limited(response):
+        return max(SECONDARY_LIMIT_WAIT, BACKOFF_BASE * 2 ** attempt)
+    return BACKOFF_BASE * 2 ** attempt
+
+def rate_limited_request(client: httpx.Client, method: str, url: str, headers: Dict = None,
+                         limiter: RateLimiter = core_limiter, **kwargs) -> httpx.Response:
+    """Send a GitHub API request, pacing against the limiter and backing off when throttled."""
+    for attempt in range(MAX_RETRIES + 1):
+        time.sleep(limiter.delay())
+        response = client.request(method, url, headers=headers, **kwargs)
+        limiter.update(response.headers)
+        if attempt == MAX_RETRIES or not is_rate_limited(response):
+            return response
+        time.sleep(backoff_delay(response, attempt))
+
+def rate_limited_get(client: httpx.Client, url: str, headers: Dict = None,
+                     limiter: RateLimiter = core_limiter) -> httpx.Response:
+    """GET a GitHub API URL through the rate limiter."""
+    return rate_limited_request(client, "GET", url, headers, limiter)
+
+class ResponseCache:
+    """Persistent cache of GitHub API responses, revalidated with their ETags."""
+
+    def __init__(self, path: str, ttl_hours: float = 0):
+        self.ttl = ttl_hours * 3600
+        self._db = shelve.open(path)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def key(url: str, headers) -> str:
+        """Cache key for a URL, scoped to the credentials it was requested with."""
+        auth = headers.get("Authorization", "")
+        return f"{hashlib.sha256(auth.encode()).hexdigest()[:16]} {url}"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached entry for a key, if any."""
+        with self._lock:
+            return self._db.get(key)
+
+    def is_fresh(self, entry: Optional[Dict]) -> bool:
+        """Whether an entry is young enough to skip revalidation entirely."""
+        return entry is not None and time.time() - entry["fetched_at"] < self.ttl
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict:
+        """Headers that let GitHub answer 304 Not Modified for an unchanged entry."""
+        if entry and entry["etag"]:
+            return {"If-None-Match": entry["etag"]}
+        return {}
+
+    def store(self, key: str, etag: Optional[str], body, link: Optional[str]) -> None:
+        with self._lock:
+            self._db[key] = {"etag": etag, "body": body, "link": link, "fetched_at": time.time()}
+
+def cached_get_json(client: httpx.Client, url: str, cache: ResponseCache) -> tuple[object, Optional[str]]:
+    """GET a GitHub API URL as JSON, returning the body and its Link header.
+
+    Unchanged responses are served from the cache via If-None-Match.
+    """
+    key = cache.key(url, client.headers)
+    entry = cache.get(key)
+    if cache.is_fresh(entry):
+        return entry["body"], entry["link"]
+    
+    response = rate_limited_get(client, url, cache.conditional_headers(entry))
+    if response.status_code == 304:
+        cache.store(key, entry["etag"], entry["body"], entry["link"])
+        return entry["body"], entry["link"]
+    
+    response.raise_for_status()
+    # Empty repositories answer 204 No Content
+    data = orjson.loads(response.content) if response.content else None
+    link = response.headers.get("Link")
+    cache.store(key, response.headers.get("ETag"), data, link)
+    return data, link
+
+def next_page_url(link: Optional[str]) -> Optional[str]:
+    """Extract the rel="next" URL from a GitHub Link header."""
+    if not link:
+        return None
+    for part in link.split(","):
+        url, _, params = part.partition(";")
+        if 'rel="next"' in params:
+            return url.strip().strip("<>")
+    return None
+
+def search_url(query: str) -> str:
+    """Build the URL-encoded search URL for a query's most-starred matches."""
+    params = {"q": query, "sort": "stars", "order": "desc", "per_page": 100}
+    return f"{SEARCH_URL}?{urlencode(params)}"
+
+async def fetch_search_results(client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                               url: str, cache: ResponseCache) -> tuple[Dict, Optional[str]]:
+    """Fetch a single page of search results, bounded by the shared semaphore."""
+    key = cache.key(url, client.headers)
+    entry = cache.get(key)
+    if cache.is_fresh(entry):
+        return entry["body"], entry["link"]
+    
+    async with semaphore:
+        for attempt in range(MAX_RETRIES + 1):
+            await asyncio.sleep(search_limiter.delay())
+            response = await client.get(url, headers=cache.conditional_headers(entry))
+            search_limiter.update(response.headers)
+            if attempt < MAX_RETRIES and is_rate_limited(response):
+                await asyncio.sleep(backoff_delay(response, attempt))
+                continue
+            if response.status_code == 304:
+                cache.store(key, entry["etag"], entry["body"], entry["link"])
+                return entry["body"], entry["link"]
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            link = response.headers.get("Link")
+            cache.store(key, response.headers.get("ETag"), data, link)
+            return data, link
+
+async def fetch_search_pages(client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                             url: str, cache: ResponseCache) -> List[Dict]:
+    """Fetch every page of a search, following Link headers up to the 1000-result cap.
+
+    A failed page ends the search early but keeps the items already fetched.
+    """
+    items = []
+    for _ in range(SEARCH_MAX_PAGES):
+        try:
+            data, link = await fetch_search_results(client, semaphore, url, cache)
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            print(f"Error fetching search page {url}: {e}")
+            break
+        items.extend(data.get("items", []))
+        url = next_page_url(link)
+        if not url:
+            break
+    return items
+
+async def search_repos(queries: List[str], client: httpx.Client, cache: ResponseCache,
+                       get_contributors: Optional[Callable] = None) -> tuple[Dict[int, Dict], Dict[int, tuple]]:
+    """Run every search query and optionally fetch each matching repo's contributors.
+
+    Returns the raw search hits keyed by repository id, deduplicated across
+    queries, and a map from repository id to get_contributors' result.
+    """
+    all_repos = {}
+    
+    # Issue every search concurrently over one multiplexed HTTP/2 connection;
+    # the semaphore keeps the fan-out polite
+    semaphore = asyncio.Semaphore(SEARCH_CONCURRENCY)
+    async with httpx.AsyncClient(http2=True, headers=client.headers, timeout=REQUEST_TIMEOUT) as async_client:
+        tasks = [
+            fetch_search_pages(async_client, semaphore, search_url(query), cache)
+            for query in queries
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    
+    # Merge the raw search hits so duplicates across queries are dropped
+    # before any contributor calls are made
+    for query, items in zip(queries, results):
+        if isinstance(items, Exception):
+            print(f"Error fetching results for query '{query}': {items}")
+            continue
+        
+        for repo in items:
+            all_repos.setdefault(repo["id"], repo)
+    
+    contributors = {}
+    if get_contributors:
+        with ThreadPoolExecutor(max_workers=CONTRIBUTOR_WORKERS) as executor:
+            futures = {
+                executor.submit(get_contributors, repo["full_name"], client, cache): repo_id
+                for repo_id, repo in all_repos.items()
+            }
+            for future in as_completed(futures):
+                contributors[futures[future]] = future.result()
+    
+    return all_repos, contributors
+
+def write_json_array(f, records) -> None:
+    """Stream records to a binary file as a JSON array, one record at a time."""
+    f.write(b"[\n")
+    for i, record in enumerate(records):
+        if i:
+            f.write(b",\n")
+        f.write(orjson.dumps(record, option=orjson.OPT_INDENT_2))
+    f.write(b"\n]\n")
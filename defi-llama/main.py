@@ -1,4 +1,5 @@
 import requests
+import orjson
 import pandas as pd
 from datetime import datetime
 import os
@@ -33,8 +34,9 @@ class ChainDataFetcher:
         try:
             response = self.session.get(f"{self.BASE_URL}{endpoint}", params=params, timeout=60)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            # Parse the raw bytes directly; DefiLlama always serves UTF-8 JSON
+            return orjson.loads(response.content)
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             print(f"Error making request to {endpoint}: {str(e)}")
             print(f"Response content: {response.text if response else 'No response'}")
             return None
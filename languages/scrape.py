@@ -2,27 +2,49 @@
 Language-specific Blockchain Repository Scraper
 ============================================
 
+Install:
+pip install -r requirements.txt
+
 Usage:
 python3 scrape.py rust --min-stars 100
 python3 scrape.py solidity --min-forks 50
 python3 scrape.py go --contributors
+python3 scrape.py rust --cache-ttl-hours 6
 
 Features:
 - Scrapes repositories in specific languages related to blockchain
 - Filters by minimum stars and forks
 - Optional contributor information
+- Caches responses on disk and revalidates them with ETags
 - Saves results in multiple formats
 """
 
-import requests
-import json
+import asyncio
+import heapq
+import httpx
+import orjson
 import os
+import sys
 from datetime import datetime
 from typing import List, Dict
 from dataclasses import dataclass
-import time
+from pathlib import Path
 from dotenv import load_dotenv
 
+# Paths are resolved once at import time; output lives in the project root
+SCRIPT_DIR = Path(__file__).resolve().parent
+OUTPUT_ROOT = SCRIPT_DIR.parent / "output"
+
+# The GitHub client helpers are shared with repos/popular.py
+sys.path.insert(0, str(SCRIPT_DIR.parent))
+from common.github_api import (
+    CACHE_PATH, REQUEST_TIMEOUT, WRITE_BUFFER_SIZE, ResponseCache,
+    cached_get_json, next_page_url, search_repos, write_json_array
+)
+
+# GitHub allows at most five AND/OR/NOT operators per search query
+MAX_OR_TERMS = 6
+
 @dataclass
 class LanguageRepo:
     name: str
@@ -52,36 +74,35 @@ def get_blockchain_keywords() -> List[str]:
     ]
 
 def get_search_queries(language: str) -> List[str]:
-    """Generate search queries combining language and blockchain terms."""
+    """Generate search queries combining language and blockchain terms.
+    
+    Terms are OR-ed together so GitHub deduplicates matches server-side,
+    chunked to stay within the per-query operator limit. The group is
+    parenthesized so the language qualifier applies to every term.
+    """
     keywords = get_blockchain_keywords()
-    queries = []
     
-    for keyword in keywords:
-        queries.append(f"language:{language} {keyword}")
-        
     # Add specific blockchain platform searches
     blockchain_platforms = [
         "ethereum", "solana", "polkadot", "cosmos", "near",
         "cardano", "avalanche", "polygon", "substrate"
     ]
     
-    for platform in blockchain_platforms:
-        queries.append(f"language:{language} {platform}")
-        
-    return queries
+    terms = keywords + blockchain_platforms
+    return [
+        f"language:{language} (" + " OR ".join(terms[i:i + MAX_OR_TERMS]) + ")"
+        for i in range(0, len(terms), MAX_OR_TERMS)
+    ]
 
-def get_all_contributors(repo_name: str, headers: Dict) -> tuple[List[Dict], bool]:
+def get_all_contributors(repo_name: str, client: httpx.Client, cache: ResponseCache) -> tuple[List[Dict], bool]:
     """Fetch all contributors for a repository."""
     contributors = []
-    page = 1
     all_fetched = True
+    url = f"https://api.github.com/repos/{repo_name}/contributors?per_page=100"
     
-    while True:
-        url = f"https://api.github.com/repos/{repo_name}/contributors?page={page}&per_page=100"
+    while url:
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+            data, link = cached_get_json(client, url, cache)
             
             if not data:
                 break
@@ -93,127 +114,89 @@ def get_all_contributors(repo_name: str, headers: Dict) -> tuple[List[Dict], boo
                 'type': c.get('type', 'Anonymous')
             } for c in data])
             
-            if 'Link' not in response.headers:
-                break
-                
-            page += 1
-            time.sleep(1)  # Rate limiting
+            # Follow GitHub's own next-page URL; absent on the last page
+            url = next_page_url(link)
             
-        except requests.RequestException as e:
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
             print(f"Error fetching contributors for {repo_name}: {e}")
             all_fetched = False
             break
     
     return contributors, all_fetched
 
-def search_language_repos(language: str, min_stars: int = 0, min_forks: int = 0, 
+async def search_language_repos(language: str, client: httpx.Client, cache: ResponseCache,
+                        min_stars: int = 0, min_forks: int = 0, 
                         fetch_contributors: bool = False) -> List[LanguageRepo]:
     """Search for blockchain-related repositories in specified language."""
     
-    load_dotenv()
-    token = os.getenv('GITHUB_TOKEN')
-    
-    headers = {
-        "Accept": "application/vnd.github.v3+json"
-    }
-    
-    if token:
-        headers["Authorization"] = f"token {token}"
-
-    queries = get_search_queries(language)
-    all_repos = {}
-    
-    for query in queries:
-        url = f"https://api.github.com/search/repositories?q={query}&sort=stars&order=desc"
-        
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            
-            for repo in data.get("items", []):
-                if (repo["stargazers_count"] >= min_stars and 
-                    repo["forks_count"] >= min_forks and
-                    repo["id"] not in all_repos):
-                    
-                    contributors = None
-                    all_contributors_fetched = False
-                    
-                    if fetch_contributors:
-                        contributors, all_contributors_fetched = get_all_contributors(
-                            repo["full_name"], headers
-                        )
-                    
-                    all_repos[repo["id"]] = LanguageRepo(
-                        name=repo["full_name"],
-                        stars=repo["stargazers_count"],
-                        forks=repo["forks_count"],
-                        last_updated=repo["updated_at"],
-                        description=repo["description"] or "",
-                        topics=repo["topics"],
-                        url=repo["html_url"],
-                        language=repo["language"],
-                        contributors=contributors,
-                        all_contributors_fetched=all_contributors_fetched
-                    )
-            
-            time.sleep(2)  # Rate limiting
-            
-        except requests.RequestException as e:
-            print(f"Error fetching results for query '{query}': {e}")
+    # Star and fork minimums are applied server-side, so they don't use up
+    # the 1000-result cap on repositories that would be dropped anyway
+    queries = [
+        f"{query} stars:>={min_stars} forks:>={min_forks}"
+        for query in get_search_queries(language)
+    ]
+    all_repos, contributors = await search_repos(
+        queries, client, cache, get_all_contributors if fetch_contributors else None
+    )
     
-    return sorted(all_repos.values(), key=lambda x: x.stars, reverse=True)
+    # Hydrate each unique repository exactly once
+    repos = []
+    for repo_id, repo in all_repos.items():
+        repo_contributors, all_contributors_fetched = contributors.get(repo_id, (None, False))
+        repos.append(LanguageRepo(
+            name=repo["full_name"],
+            stars=repo["stargazers_count"],
+            forks=repo["forks_count"],
+            last_updated=repo["updated_at"],
+            description=repo["description"] or "",
+            topics=repo["topics"],
+            url=repo["html_url"],
+            language=repo["language"],
+            contributors=repo_contributors,
+            all_contributors_fetched=all_contributors_fetched
+        ))
+    
+    return sorted(repos, key=lambda x: x.stars, reverse=True)
 
 def save_results(language: str, repos: List[LanguageRepo]):
     """Save results to markdown and JSON files."""
     
-    # Get the absolute path of the script's directory
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # Go up one directory to reach project root
-    project_root = os.path.dirname(script_dir)
-    
     # Create output directory in project root
-    output_dir = os.path.join(project_root, "output", f"{language}-repos")
-    os.makedirs(output_dir, exist_ok=True)
+    output_dir = OUTPUT_ROOT / f"{language}-repos"
+    output_dir.mkdir(parents=True, exist_ok=True)
     
     date_str = datetime.now().strftime("%Y-%m-%d")
     
     # Save as markdown
-    md_file = os.path.join(output_dir, f"{language}_repos_{date_str}.md")
-    with open(md_file, "w", encoding="utf-8") as f:
-        f.write(f"# {language.title()} Blockchain Repositories\n\n")
-        f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-        
-        for repo in repos:
-            f.write(f"## [{repo.name}]({repo.url})\n")
-            f.write(f"⭐ Stars: {repo.stars} | 🔄 Forks: {repo.forks}\n\n")
-            f.write(f"{repo.description}\n\n")
-            if repo.topics:
-                f.write("**Topics:** " + ", ".join(repo.topics) + "\n\n")
-            if repo.contributors:
-                f.write("### Top Contributors:\n")
-                for contrib in sorted(repo.contributors, 
-                                   key=lambda x: x['contributions'], 
-                                   reverse=True)[:10]:
-                    f.write(f"- [{contrib['username']}]({contrib['profile']}): "
-                           f"{contrib['contributions']} contributions\n")
-            f.write("---\n\n")
+    md_file = output_dir / f"{language}_repos_{date_str}.md"
+    # Buffer the document and write it in one call
+    chunks = [
+        f"# {language.title()} Blockchain Repositories\n\n",
+        f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+    ]
+    
+    for repo in repos:
+        chunks.append(f"## [{repo.name}]({repo.url})\n")
+        chunks.append(f"⭐ Stars: {repo.stars} | 🔄 Forks: {repo.forks}\n\n")
+        chunks.append(f"{repo.description}\n\n")
+        if repo.topics:
+            chunks.append("**Topics:** " + ", ".join(repo.topics) + "\n\n")
+        if repo.contributors:
+            chunks.append("### Top Contributors:\n")
+            for contrib in heapq.nlargest(10, repo.contributors,
+                                          key=lambda x: x['contributions']):
+                chunks.append(f"- [{contrib['username']}]({contrib['profile']}): "
+                              f"{contrib['contributions']} contributions\n")
+        chunks.append("---\n\n")
+    
+    with open(md_file, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+        f.write("".join(chunks))
     
     # Save as JSON
-    json_file = os.path.join(output_dir, f"{language}_repos_{date_str}.json")
-    with open(json_file, "w", encoding="utf-8") as f:
-        json.dump([{
-            "name": repo.name,
-            "stars": repo.stars,
-            "forks": repo.forks,
-            "last_updated": repo.last_updated,
-            "description": repo.description,
-            "topics": repo.topics,
-            "url": repo.url,
-            "language": repo.language,
-            "contributors": repo.contributors
-        } for repo in repos], f, indent=2)
+    json_file = output_dir / f"{language}_repos_{date_str}.json"
+    with open(json_file, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        # orjson serializes the dataclasses natively, with no per-repo dict copy
+        write_json_array(f, repos)
 
 def main():
     import argparse
@@ -223,16 +206,32 @@ def main():
     parser.add_argument('--min-stars', type=int, default=0, help='Minimum number of stars')
     parser.add_argument('--min-forks', type=int, default=0, help='Minimum number of forks')
     parser.add_argument('--contributors', action='store_true', help='Fetch contributor information')
+    parser.add_argument('--cache-ttl-hours', type=float, default=0,
+                        help='Reuse cached responses younger than this without revalidating (default: 0)')
     
     args = parser.parse_args()
     
+    load_dotenv()
+    token = os.getenv('GITHUB_TOKEN')
+    
+    headers = {
+        "Accept": "application/vnd.github.v3+json"
+    }
+    
+    if token:
+        headers["Authorization"] = f"token {token}"
+    
     print(f"Searching for {args.language} blockchain repositories...")
-    repos = search_language_repos(
-        args.language,
-        min_stars=args.min_stars,
-        min_forks=args.min_forks,
-        fetch_contributors=args.contributors
-    )
+    with httpx.Client(http2=True, headers=headers, timeout=REQUEST_TIMEOUT) as client, \
+            ResponseCache(CACHE_PATH, args.cache_ttl_hours) as cache:
+        repos = asyncio.run(search_language_repos(
+            args.language,
+            client,
+            cache,
+            min_stars=args.min_stars,
+            min_forks=args.min_forks,
+            fetch_contributors=args.contributors
+        ))
     
     print(f"\nFound {len(repos)} repositories")
     save_results(args.language, repos)
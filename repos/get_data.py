@@ -1,17 +1,38 @@
 import requests
-import json
-import csv
+import ijson
+import orjson
+import sys
 from datetime import datetime
-import os
+from pathlib import Path
 import pandas as pd
-import markdown
-from tabulate import tabulate
 
-def ensure_directory_exists(file_path):
-    """Create directory if it doesn't exist"""
-    directory = os.path.dirname(file_path)
-    if directory and not os.path.exists(directory):
-        os.makedirs(directory)
+# Seconds to wait for DefiLlama to connect or send the next chunk
+REQUEST_TIMEOUT = 30
+
+# Rows rendered into the markdown preview; the full data goes to CSV/Parquet
+PREVIEW_ROWS = 20
+
+# Resolved once at import time, relative to the script location
+SCRIPT_DIR = Path(__file__).resolve().parent
+BASE_OUTPUT_DIR = SCRIPT_DIR / 'output' / 'solana-defi-llama-data' / 'solana'
+
+# Output buffering is shared with the GitHub scrapers
+sys.path.insert(0, str(SCRIPT_DIR.parent))
+from common.github_api import WRITE_BUFFER_SIZE
+
+def to_json_text(value):
+    # Nested fields (chains, tokens, ...) and columns mixing scalar types are
+    # stored as JSON strings so every value in a column has one type that
+    # Parquet can represent
+    if not isinstance(value, (list, dict)) and pd.isna(value):
+        return None
+    return orjson.dumps(value).decode()
+
+def write_parquet(df, parquet_path):
+    # convert_dtypes leaves only nested or mixed-type columns as object
+    object_columns = df.select_dtypes(include='object').columns
+    df = df.assign(**{col: df[col].map(to_json_text) for col in object_columns})
+    df.to_parquet(parquet_path, compression='zstd', index=False)
 
 def create_markdown_report(csv_path, output_path):
     # Read CSV data
@@ -21,14 +42,17 @@ def create_markdown_report(csv_path, output_path):
     desired_columns = ['name', 'tvl', 'category', 'change_1d', 'change_7d', 'url']
     key_columns = [col for col in desired_columns if col in df.columns]
 
-    # Create markdown table
-    markdown_table = df[key_columns].to_markdown(index=False)
+    # Create markdown table for the top rows only; the full data stays in
+    # the CSV and a zstd-compressed Parquet file for downstream analysis
+    markdown_table = df[key_columns].head(PREVIEW_ROWS).to_markdown(index=False)
+    csv_name = Path(csv_path).name
+    parquet_name = Path(csv_path).with_suffix('.parquet').name
 
     # Create the output markdown file
     output = f"""# Solana DeFi Protocols
 
 <details>
-<summary>View Protocol List (Click to expand)</summary>
+<summary>View Top {min(PREVIEW_ROWS, len(df))} of {len(df)} Protocols (Click to expand)</summary>
 
 {markdown_table}
 
@@ -36,55 +60,51 @@ def create_markdown_report(csv_path, output_path):
 
 ## Additional Details
 
-<details>
-<summary>Full Protocol Information</summary>
-
-{df.to_markdown(index=False)}
-
-</details>
+Full protocol information is available in [{csv_name}]({csv_name}) and [{parquet_name}]({parquet_name}).
 """
 
-    # Ensure directory exists and write to file
-    ensure_directory_exists(output_path)
-    with open(output_path, 'w', encoding='utf-8') as f:
+    # Write to file
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
         f.write(output)
 
 def get_data(output_file_csv, output_file_md):
     url = "https://api.llama.fi/protocols"
-    response = requests.get(url)
-    data = response.json()
+    with requests.get(url, stream=True, timeout=REQUEST_TIMEOUT) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
 
-    # Filter for Solana protocols
-    solana_protocols = [protocol for protocol in data if "Solana" in protocol.get("chains", [])]
+        # Stream protocols one at a time, keeping only the Solana ones
+        solana_protocols = [
+            protocol for protocol in ijson.items(response.raw, 'item', use_float=True)
+            if "Solana" in protocol.get("chains", [])
+        ]
 
-    # Get all possible fields from all protocols
-    fieldnames = set()
-    for protocol in solana_protocols:
-        fieldnames.update(protocol.keys())
-    fieldnames = sorted(list(fieldnames))
+    # The DataFrame's columns are the union of every protocol's fields; nullable
+    # dtypes keep integer columns with gaps from being written as floats
+    df = pd.DataFrame(solana_protocols).convert_dtypes()
+    df = df[sorted(df.columns)]
 
-    # Ensure directory exists before writing
-    ensure_directory_exists(output_file_csv)
+    # Ensure each output directory exists once, before writing
+    for directory in {Path(output_file_csv).parent, Path(output_file_md).parent}:
+        directory.mkdir(parents=True, exist_ok=True)
 
     # Write to CSV
-    with open(output_file_csv, 'w', newline='', encoding='utf-8') as file:
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(solana_protocols)
+    df.to_csv(output_file_csv, index=False)
 
     # After writing CSV, create markdown report
     create_markdown_report(output_file_csv, output_file_md)
 
+    # Last, a zstd-compressed Parquet copy built from the in-memory frame so
+    # it keeps the original dtypes; a failure here leaves the CSV and report
+    write_parquet(df, Path(output_file_csv).with_suffix('.parquet'))
+
 if __name__ == "__main__":
-    # Set up base directory relative to the script location
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    base_output_dir = os.path.join(script_dir, 'output', 'solana-defi-llama-data', 'solana')
-    
     # Generate today's date
     today = datetime.now().strftime('%Y-%m-%d')
     
     # Create file paths
-    output_file_csv = os.path.join(base_output_dir, f'protocols-{today}.csv')
-    output_file_md = os.path.join(base_output_dir, f'protocols-{today}.md')
+    output_file_csv = BASE_OUTPUT_DIR / f'protocols-{today}.csv'
+    output_file_md = BASE_OUTPUT_DIR / f'protocols-{today}.md'
     
     get_data(output_file_csv, output_file_md)
\ No newline at end of file
@@ -1,4 +1,7 @@
 """
+# Install dependencies (httpx needs h2 for HTTP/2)
+pip install -r requirements.txt
+
 # Basic usage
 python3 popular.py solana
 
@@ -10,17 +13,61 @@ python3 popular.py polkadot --contributors
 
 # Combine all options
 python3 popular.py solana --min-stars 500 --min-forks 50 --contributors
+
+# Reuse cached responses for up to 6 hours without revalidating
+python3 popular.py solana --cache-ttl-hours 6
+
+# Fetch repos and their mentionable users through the GraphQL API
+# (token required; GraphQL responses are not cached)
+python3 popular.py solana --contributors --graphql
 """
 
-import requests
-import json
+import asyncio
+import heapq
+import httpx
+import orjson
 import os
+import sys
 from datetime import datetime
 from typing import List, Dict
 from dataclasses import dataclass
-import time
+from pathlib import Path
 from dotenv import load_dotenv
 
+# Paths are resolved once at import time; output lives beside the project
+SCRIPT_DIR = Path(__file__).resolve().parent
+OUTPUT_ROOT = SCRIPT_DIR.parent.parent / "output"
+
+# The GitHub client helpers are shared with languages/scrape.py
+sys.path.insert(0, str(SCRIPT_DIR.parent))
+from common.github_api import (
+    CACHE_PATH, GRAPHQL_URL, REQUEST_TIMEOUT, WRITE_BUFFER_SIZE, ResponseCache,
+    cached_get_json, graphql_limiter, next_page_url, rate_limited_request,
+    search_repos, write_json_array
+)
+
+# Repositories plus (optionally) their users, 100 per page
+GRAPHQL_SEARCH_QUERY = """
+query($q: String!, $cursor: String, $withUsers: Boolean!) {
+  search(query: $q, type: REPOSITORY, first: 100, after: $cursor) {
+    pageInfo { endCursor hasNextPage }
+    nodes {
+      ... on Repository {
+        databaseId
+        nameWithOwner
+        stargazerCount
+        forkCount
+        updatedAt
+        description
+        url
+        repositoryTopics(first: 20) { nodes { topic { name } } }
+        mentionableUsers(first: 10) @include(if: $withUsers) { nodes { login url } }
+      }
+    }
+  }
+}
+"""
+
 @dataclass
 class BlockchainRepo:
     name: str
@@ -32,6 +79,7 @@ class BlockchainRepo:
     url: str
     contributors: List[Dict] = None
     all_contributors_fetched: bool = False
+    users: List[Dict] = None
 
 def get_search_queries(blockchain: str) -> List[str]:
     """Generate search queries based on blockchain name."""
@@ -42,17 +90,14 @@ def get_search_queries(blockchain: str) -> List[str]:
         f"{blockchain} web3"
     ]
 
-def get_all_contributors(repo_name: str, headers: Dict) -> List[Dict]:
+def get_all_contributors(repo_name: str, client: httpx.Client, cache: ResponseCache) -> List[Dict]:
     """Fetch ALL contributors for a given repository, handling pagination."""
     contributors = []
-    page = 1
+    url = f"https://api.github.com/repos/{repo_name}/contributors?per_page=100&anon=true"
     
-    while True:
-        url = f"https://api.github.com/repos/{repo_name}/contributors?page={page}&per_page=100&anon=true"
+    while url:
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+            data, link = cached_get_json(client, url, cache)
             
             if not data:  # No more contributors
                 break
@@ -65,13 +110,10 @@ def get_all_contributors(repo_name: str, headers: Dict) -> List[Dict]:
                 'repo': repo_name
             } for c in data])
             
-            # Check for rate limiting
-            if 'Link' not in response.headers:
-                break
-                
-            time.sleep(2)  # Increased rate limiting pause
+            # Follow GitHub's own next-page URL; absent on the last page
+            url = next_page_url(link)
             
-        except requests.RequestException as e:
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
             print(f"Error fetching contributors for {repo_name}: {e}")
             return contributors, False
     
@@ -79,120 +121,166 @@ def get_all_contributors(repo_name: str, headers: Dict) -> List[Dict]:
 
 def save_contributor_data(blockchain: str, all_contributors: List[Dict]):
     """Save all contributor data to a separate file."""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    output_base = os.path.join(os.path.dirname(os.path.dirname(script_dir)), "output")
-    output_dir = os.path.join(output_base, f"{blockchain}-contributors")
-    os.makedirs(output_dir, exist_ok=True)
+    output_dir = OUTPUT_ROOT / f"{blockchain}-contributors"
+    output_dir.mkdir(parents=True, exist_ok=True)
     
     date_str = datetime.now().strftime("%Y-%m-%d")
     
     # Save as JSON
-    json_file = os.path.join(output_dir, f"{blockchain}_contributors_{date_str}.json")
-    with open(json_file, "w", encoding="utf-8") as f:
-        json.dump(all_contributors, f, indent=2)
+    json_file = output_dir / f"{blockchain}_contributors_{date_str}.json"
+    with open(json_file, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        write_json_array(f, all_contributors)
     
     # Save as CSV
-    csv_file = os.path.join(output_dir, f"{blockchain}_contributors_{date_str}.csv")
+    csv_file = output_dir / f"{blockchain}_contributors_{date_str}.csv"
     import csv
-    with open(csv_file, "w", newline="", encoding="utf-8") as f:
+    with open(csv_file, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
         writer = csv.DictWriter(f, fieldnames=['username', 'contributions', 'profile', 'type', 'repo'])
         writer.writeheader()
         writer.writerows(all_contributors)
 
-def search_blockchain_repos(blockchain: str, min_stars: int = 0, min_forks: int = 0, 
-                          fetch_contributors: bool = False, token: str = None) -> List[BlockchainRepo]:
+async def search_blockchain_repos(blockchain: str, client: httpx.Client, cache: ResponseCache,
+                          min_stars: int = 0, min_forks: int = 0, 
+                          fetch_contributors: bool = False) -> List[BlockchainRepo]:
     """Modified to fetch all contributors when requested."""
     
-    headers = {
-        "Accept": "application/vnd.github.v3+json"
-    }
+    queries = [
+        f"{query} stars:>={min_stars} forks:>={min_forks}"
+        for query in get_search_queries(blockchain)
+    ]
+    all_repos, contributors = await search_repos(
+        queries, client, cache, get_all_contributors if fetch_contributors else None
+    )
     
-    if token:
-        headers["Authorization"] = f"token {token}"
+    # Hydrate each unique repository exactly once
+    repos = []
+    for repo_id, repo in all_repos.items():
+        repo_contributors, all_contributors_fetched = contributors.get(repo_id, (None, False))
+        repos.append(BlockchainRepo(
+            name=repo["full_name"],
+            stars=repo["stargazers_count"],
+            forks=repo["forks_count"],
+            last_updated=repo["updated_at"],
+            description=repo["description"] or "",
+            topics=repo["topics"],
+            url=repo["html_url"],
+            contributors=repo_contributors,
+            all_contributors_fetched=all_contributors_fetched
+        ))
+    
+    if fetch_contributors:
+        save_contributor_data(blockchain, [
+            c for repo in repos if repo.contributors for c in repo.contributors
+        ])
+    
+    return sorted(repos, key=lambda x: x.stars, reverse=True)
 
-    queries = get_search_queries(blockchain)
+def graphql_search(blockchain: str, client: httpx.Client, min_stars: int = 0, min_forks: int = 0,
+                   fetch_contributors: bool = False) -> List[BlockchainRepo]:
+    """Search repositories and their users in one round-trip per page via GraphQL.
+    
+    GraphQL exposes no contributor list, so repos get up to 10 of their
+    mentionableUsers instead. These are people who can be @-mentioned
+    (collaborators, issue authors, ...), not commit authors, so they are
+    kept in `users` and never reported as contributors.
+    """
     all_repos = {}
     
-    all_contributors = []
-    for query in queries:
-        query_with_filters = f"{query}+stars:>={min_stars}+forks:>={min_forks}"
-        url = f"https://api.github.com/search/repositories?q={query_with_filters}&sort=stars&order=desc&per_page=100"
+    for query in get_search_queries(blockchain):
+        variables = {
+            "q": f"{query} stars:>={min_stars} forks:>={min_forks} sort:stars",
+            "cursor": None,
+            "withUsers": fetch_contributors
+        }
         
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+        while True:
+            try:
+                response = rate_limited_request(
+                    client, "POST", GRAPHQL_URL, {"Content-Type": "application/json"}, graphql_limiter,
+                    content=orjson.dumps({"query": GRAPHQL_SEARCH_QUERY, "variables": variables})
+                )
+                response.raise_for_status()
+                payload = orjson.loads(response.content)
+            except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+                print(f"Error fetching results for query '{query}': {e}")
+                break
             
-            for repo in data.get("items", []):
-                if repo["id"] not in all_repos:
-                    contributors = None
-                    all_contributors_fetched = False
-                    
-                    if fetch_contributors:
-                        contributors, all_contributors_fetched = get_all_contributors(repo["full_name"], headers)
-                        if contributors:
-                            all_contributors.extend(contributors)
-                            
-                    all_repos[repo["id"]] = BlockchainRepo(
-                        name=repo["full_name"],
-                        stars=repo["stargazers_count"],
-                        forks=repo["forks_count"],
-                        last_updated=repo["updated_at"],
-                        description=repo["description"] or "",
-                        topics=repo["topics"],
-                        url=repo["html_url"],
-                        contributors=contributors,
-                        all_contributors_fetched=all_contributors_fetched
-                    )
+            if payload.get("errors"):
+                print(f"Error fetching results for query '{query}': {payload['errors']}")
+                break
             
-            time.sleep(2)
+            search = payload["data"]["search"]
+            for node in search["nodes"]:
+                if not node or node["databaseId"] in all_repos:
+                    continue
+                
+                users = None
+                if fetch_contributors:
+                    users = [{
+                        'username': user['login'],
+                        'profile': user['url']
+                    } for user in node["mentionableUsers"]["nodes"]]
+                
+                all_repos[node["databaseId"]] = BlockchainRepo(
+                    name=node["nameWithOwner"],
+                    stars=node["stargazerCount"],
+                    forks=node["forkCount"],
+                    last_updated=node["updatedAt"],
+                    description=node["description"] or "",
+                    topics=[t["topic"]["name"] for t in node["repositoryTopics"]["nodes"]],
+                    url=node["url"],
+                    users=users
+                )
             
-        except requests.RequestException as e:
-            print(f"Error fetching results for query '{query}': {e}")
-    
-    if fetch_contributors:
-        save_contributor_data(blockchain, all_contributors)
+            if not search["pageInfo"]["hasNextPage"]:
+                break
+            variables["cursor"] = search["pageInfo"]["endCursor"]
     
     return sorted(all_repos.values(), key=lambda x: x.stars, reverse=True)
 
 def save_results(blockchain: str, repos: List[BlockchainRepo], format: str = "markdown"):
     """Save repository results in the specified format."""
     
-    # Get the absolute path of the script's directory
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    # Resolve output path relative to project root
-    output_base = os.path.join(os.path.dirname(os.path.dirname(script_dir)), "output")
-    output_dir = os.path.join(output_base, f"{blockchain}-repos")
-    os.makedirs(output_dir, exist_ok=True)
+    output_dir = OUTPUT_ROOT / f"{blockchain}-repos"
+    output_dir.mkdir(parents=True, exist_ok=True)
     
     date_str = datetime.now().strftime("%Y-%m-%d")
     
     if format == "markdown":
-        output_file = os.path.join(output_dir, f"{blockchain}_repos_{date_str}.md")
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(f"# Popular {blockchain.title()} Repositories\n\n")
-            f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            
-            for repo in repos:
-                f.write(f"## [{repo.name}]({repo.url})\n")
-                f.write(f"⭐ Stars: {repo.stars} | 🔄 Forks: {repo.forks}\n\n")
-                f.write(f"{repo.description}\n\n")
-                if repo.topics:
-                    f.write("**Topics:** " + ", ".join(repo.topics) + "\n\n")
-                if repo.contributors:
-                    f.write("### Top Contributors:\n")
-                    for contrib in sorted(repo.contributors, 
-                                       key=lambda x: x['contributions'], 
-                                       reverse=True)[:10]:  # Show top 10
-                        f.write(f"- [{contrib['username']}]({contrib['profile']}): "
-                               f"{contrib['contributions']} contributions\n")
-                    f.write("\n")
-                f.write("---\n\n")
+        output_file = output_dir / f"{blockchain}_repos_{date_str}.md"
+        # Buffer the document and write it in one call
+        chunks = [
+            f"# Popular {blockchain.title()} Repositories\n\n",
+            f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+        ]
+        
+        for repo in repos:
+            chunks.append(f"## [{repo.name}]({repo.url})\n")
+            chunks.append(f"⭐ Stars: {repo.stars} | 🔄 Forks: {repo.forks}\n\n")
+            chunks.append(f"{repo.description}\n\n")
+            if repo.topics:
+                chunks.append("**Topics:** " + ", ".join(repo.topics) + "\n\n")
+            if repo.contributors:
+                chunks.append("### Top Contributors:\n")
+                for contrib in heapq.nlargest(10, repo.contributors,  # Show top 10
+                                              key=lambda x: x['contributions']):
+                    chunks.append(f"- [{contrib['username']}]({contrib['profile']}): "
+                                  f"{contrib['contributions']} contributions\n")
+                chunks.append("\n")
+            if repo.users:
+                chunks.append("### Mentionable Users:\n")
+                for user in repo.users:
+                    chunks.append(f"- [{user['username']}]({user['profile']})\n")
+                chunks.append("\n")
+            chunks.append("---\n\n")
+        
+        with open(output_file, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+            f.write("".join(chunks))
     
     elif format == "json":
-        output_file = os.path.join(output_dir, f"{blockchain}_repos_{date_str}.json")
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump([vars(repo) for repo in repos], f, indent=2)
+        output_file = output_dir / f"{blockchain}_repos_{date_str}.json"
+        with open(output_file, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+            write_json_array(f, repos)
 
 def main():
     # Load environment variables from .env file
@@ -205,6 +293,11 @@ def main():
     parser.add_argument('--min-stars', type=int, default=0, help='Minimum number of stars')
     parser.add_argument('--min-forks', type=int, default=0, help='Minimum number of forks')
     parser.add_argument('--contributors', action='store_true', help='Fetch contributor information')
+    parser.add_argument('--cache-ttl-hours', type=float, default=0,
+                        help='Reuse cached responses younger than this without revalidating (default: 0)')
+    parser.add_argument('--graphql', action='store_true',
+                        help='Search via the GraphQL API; --contributors then lists up to 10 mentionable '
+                             'users per repo instead of contributors. Responses are not cached')
     
     args = parser.parse_args()
     
@@ -222,13 +315,41 @@ def main():
     print(f"Minimum forks: {args.min_forks}")
     print(f"Fetching contributors: {args.contributors}")
     
-    repos = search_blockchain_repos(
-        blockchain, 
-        min_stars=args.min_stars, 
-        min_forks=args.min_forks,
-        fetch_contributors=args.contributors,
-        token=token
-    )
+    if args.graphql and not token:
+        print("Error: the GraphQL API requires a GitHub token.")
+        return
+    
+    if args.graphql and args.cache_ttl_hours:
+        print("Error: --cache-ttl-hours has no effect with --graphql; GraphQL responses are not cached.")
+        return
+    
+    headers = {
+        "Accept": "application/vnd.github.v3+json"
+    }
+    
+    if token:
+        headers["Authorization"] = f"token {token}"
+    
+    # One pooled HTTP/2 client carries every request of the run
+    with httpx.Client(http2=True, headers=headers, timeout=REQUEST_TIMEOUT) as client:
+        if args.graphql:
+            repos = graphql_search(
+                blockchain,
+                client,
+                min_stars=args.min_stars,
+                min_forks=args.min_forks,
+                fetch_contributors=args.contributors
+            )
+        else:
+            with ResponseCache(CACHE_PATH, args.cache_ttl_hours) as cache:
+                repos = asyncio.run(search_blockchain_repos(
+                    blockchain, 
+                    client,
+                    cache,
+                    min_stars=args.min_stars, 
+                    min_forks=args.min_forks,
+                    fetch_contributors=args.contributors
+                ))
     
     print(f"\nFound {len(repos)} unique repositories")
     print("\nTop 10 repositories by stars:")